@@ -1,40 +1,74 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response, status
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.decorator import cache
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.datastructures import Headers, MutableHeaders
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any, Tuple, Awaitable
 import uuid
 from datetime import datetime, timezone
 import jwt
 import bcrypt
+import hashlib
+import orjson
+from cachetools import TTLCache
 import httpx
 from contextlib import asynccontextmanager
 import asyncio
+import time
 from zoneinfo import ZoneInfo
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=50,
+    minPoolSize=5,
+    serverSelectionTimeoutMS=3000,
+    retryWrites=True,
+    compressors="zstd,zlib",
+    readPreference="primaryPreferred"
+)
 db = client[os.environ['DB_NAME']]
 
 # JWT Settings
 JWT_SECRET = os.environ.get('JWT_SECRET', 'event-dashboard-secret-key-change-in-production')
 JWT_ALGORITHM = "HS256"
 
+# Verified tokens -> (username, exp), so repeated requests skip jwt.decode
+_jwt_cache = TTLCache(maxsize=1024, ttl=300)
+
 # N8N Webhook URL
 N8N_WEBHOOK_URL = os.environ.get('N8N_WEBHOOK_URL', '')
 
 # External State API
 EXTERNAL_STATE_API = os.environ.get('EXTERNAL_STATE_API', 'http://127.0.0.1:3100/api/state')
 
+# Redis cache for the full state (optional, disabled when empty)
+REDIS_URL = os.environ.get('REDIS_URL', '')
+STATE_CACHE_TTL = 60
+
+# Response cache for public list endpoints (Redis if configured, else in memory)
+ROUTE_CACHE_TTL = 30
+ROUTE_CACHE_NAMESPACE = "state"
+
 # Timezone (default: Europe/Berlin for German events)
 EVENT_TIMEZONE = os.environ.get('EVENT_TIMEZONE', 'Europe/Berlin')
 
@@ -43,6 +77,39 @@ security = HTTPBearer(auto_error=False)
 # Background task reference
 auto_advance_task = None
 
+# Wakes the auto-advance loop early when the state changes
+_advance_wake = asyncio.Event()
+
+# In-process caches for rarely changing documents: (fetched_at, value)
+LOCAL_CACHE_TTL = 2.0
+_settings_cache: Optional[Tuple[float, Optional[Dict[str, Any]]]] = None
+_phases_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+
+# State version used for ETags when Redis is not configured
+_boot_id = uuid.uuid4().hex[:8]
+_local_state_version = 0
+
+# Redis hash holding the shared state version: "gen" (random, recreated if the hash is lost) + "ver"
+STATE_VERSION_KEY = "state:version"
+# Set when a Redis version bump failed; the local version is used until a bump succeeds again
+_redis_version_stale = False
+
+# Serialises current-item switches (the unique is_current index rejects overlapping ones)
+_current_item_lock = asyncio.Lock()
+
+# Hash of the last state the external API accepted
+_last_sent_hash = None
+
+# Background sync: one task at a time; requests arriving meanwhile set _sync_pending and
+# are coalesced into a single follow-up sync of the then-current state
+_sync_task: Optional[asyncio.Task] = None
+_sync_pending = False
+# Held from reading the state until its hash is stored, so sends can't overtake each other
+_sync_lock = asyncio.Lock()
+
+# Redis client (set in lifespan when REDIS_URL is configured)
+redis_client = None
+
 # =============== BACKGROUND TASKS ===============
 
 async def auto_advance_loop():
@@ -50,72 +117,180 @@ async def auto_advance_loop():
     tz = ZoneInfo(EVENT_TIMEZONE)
     
     while True:
+        # Idle interval when nothing is running; shortened below to the current item's end
+        sleep_s = 30.0
         try:
-            settings = await db.settings.find_one({"id": "main"}, {"_id": 0})
+            settings, current_item = await asyncio.gather(
+                get_settings_cached(),
+                db.schedule.find_one({"is_current": True}, {"_id": 0, "id": 1, "order": 1, "title": 1, "end_time": 1, "end_minutes": 1})
+            )
             if settings and not settings.get("is_paused", False) and settings.get("auto_advance", True):
-                current_item = await db.schedule.find_one({"is_current": True}, {"_id": 0})
-                
                 if current_item:
                     now = datetime.now(tz)
-                    end_time_str = current_item.get("end_time", "")
+                    # end_minutes is precomputed on write; older items only have end_time
+                    if "end_minutes" in current_item:
+                        end_minutes = current_item["end_minutes"]
+                    else:
+                        end_minutes = parse_end_minutes(current_item.get("end_time", ""))
                     
-                    if end_time_str:
-                        try:
-                            end_hours, end_minutes = map(int, end_time_str.split(":"))
-                            end_time = now.replace(hour=end_hours, minute=end_minutes, second=0, microsecond=0)
+                    if end_minutes is not None:
+                        seconds_left = end_minutes * 60 - (now.hour * 3600 + now.minute * 60 + now.second)
+                        
+                        # Debug log
+                        logging.debug(f"Auto-advance check: now={now.strftime('%H:%M:%S')}, seconds_left={seconds_left}, current={current_item['title']}")
+                        
+                        if seconds_left <= 0:
+                            # Time's up - advance to next item
+                            next_item = await find_adjacent_item(current_item, forward=True)
                             
-                            # Debug log
-                            logging.debug(f"Auto-advance check: now={now.strftime('%H:%M:%S')}, end_time={end_time.strftime('%H:%M:%S')}, current={current_item['title']}")
+                            logging.info(f"Time expired for '{current_item['title']}' (ended {current_item.get('end_time')}), advancing...")
                             
-                            if now >= end_time:
-                                # Time's up - advance to next item
-                                items = await db.schedule.find({}, {"_id": 0}).sort("order", 1).to_list(1000)
-                                current_idx = next((i for i, item in enumerate(items) if item["id"] == current_item["id"]), -1)
-                                
-                                logging.info(f"Time expired for '{current_item['title']}' (ended {end_time_str}), advancing...")
+                            if next_item:
+                                await mark_current_item(next_item["id"])
+                                await bump_state_version()
+                                logging.info(f"Auto-advanced to: {next_item['title']}")
                                 
-                                if current_idx >= 0 and current_idx < len(items) - 1:
-                                    next_item = items[current_idx + 1]
-                                    await db.schedule.update_many({}, {"$set": {"is_current": False}})
-                                    await db.schedule.update_one({"id": next_item["id"]}, {"$set": {"is_current": True}})
-                                    await db.settings.update_one({"id": "main"}, {"$set": {"current_item_id": next_item["id"]}})
-                                    logging.info(f"Auto-advanced to: {next_item['title']}")
-                                    
-                                    # Sync to external API (don't wait/block on failure)
-                                    try:
-                                        await sync_state_to_external()
-                                    except Exception as sync_err:
-                                        logging.warning(f"Sync failed (non-blocking): {sync_err}")
-                                elif current_idx == len(items) - 1:
-                                    # Last item finished - clear current
-                                    await db.schedule.update_many({}, {"$set": {"is_current": False}})
-                                    await db.settings.update_one({"id": "main"}, {"$set": {"current_item_id": None}})
-                                    logging.info("Event ended - last item completed")
-                        except ValueError as ve:
-                            logging.error(f"Invalid time format: {end_time_str}, error: {ve}")
+                                # Sync to external API (don't wait/block on failure)
+                                schedule_external_sync()
+                            else:
+                                # Last item finished - clear current
+                                await db.schedule.update_one({"is_current": True}, {"$set": {"is_current": False}})
+                                await db.settings.update_one({"id": "main"}, {"$set": {"current_item_id": None}})
+                                await bump_state_version()
+                                logging.info("Event ended - last item completed")
+                        else:
+                            # Sleep until the item ends (re-checked at least every minute)
+                            sleep_s = min(max(1.0, seconds_left), 60.0)
         except Exception as e:
             logging.error(f"Auto-advance error: {e}")
         
-        await asyncio.sleep(5)  # Check every 5 seconds
+        # Mutating endpoints set _advance_wake to cut the sleep short
+        try:
+            await asyncio.wait_for(_advance_wake.wait(), timeout=sleep_s)
+        except asyncio.TimeoutError:
+            pass
+        _advance_wake.clear()
 
-async def sync_state_to_external():
-    """Send current state to external API"""
+def parse_end_minutes(end_time: str) -> Optional[int]:
+    """Convert an "HH:MM" end time to minutes after midnight (None if invalid)"""
+    try:
+        hours, minutes = map(int, end_time.split(":"))
+        if not (0 <= hours < 24 and 0 <= minutes < 60):
+            raise ValueError("out of range")
+        return hours * 60 + minutes
+    except (ValueError, AttributeError) as e:
+        if end_time:
+            logging.error(f"Invalid time format: {end_time}, error: {e}")
+        return None
+
+def prepare_schedule_import(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Turn imported schedule items into documents: drop _id, add order/end_minutes, keep one current"""
+    docs = []
+    has_current = False
+    for idx, item in enumerate(items):
+        doc = {k: v for k, v in item.items() if k != "_id"}
+        # next/previous walk (order, id), so items without an order keep their list position
+        doc.setdefault("order", idx)
+        doc["end_minutes"] = parse_end_minutes(doc.get("end_time", ""))
+        if doc.get("is_current"):
+            doc["is_current"] = not has_current
+            has_current = True
+        docs.append(doc)
+    return docs
+
+async def sync_state_to_external(force: bool = False):
+    """Send current state to external API (skipped if unchanged since the last send)"""
+    global _last_sent_hash
     if not EXTERNAL_STATE_API:
         return
     
-    try:
-        state = await get_full_state()
-        async with httpx.AsyncClient() as http_client:
-            response = await http_client.post(EXTERNAL_STATE_API, json=state, timeout=10)
+    async with _sync_lock:
+        try:
+            state = await get_full_state()
+            
+            # Hash without the timestamp, which differs on every call
+            state_hash = hashlib.blake2b(
+                orjson.dumps({k: v for k, v in state.items() if k != "timestamp"}),
+                digest_size=16
+            ).digest()
+            if not force and state_hash == _last_sent_hash:
+                logging.debug("State unchanged, skipping external sync")
+                return
+            
+            response = await app.state.http.post(
+                EXTERNAL_STATE_API,
+                content=orjson.dumps(state),
+                headers={"Content-Type": "application/json"}
+            )
             logging.info(f"Synced state to external API: {response.status_code}")
-    except Exception as e:
-        logging.error(f"Failed to sync to external API: {e}")
+            if response.is_success:
+                _last_sent_hash = state_hash
+        except Exception as e:
+            logging.error(f"Failed to sync to external API: {e}")
+
+def schedule_external_sync():
+    """Sync state to external API in the background so callers don't wait on the network"""
+    global _sync_task, _sync_pending
+    _sync_pending = True
+    if _sync_task is None or _sync_task.done():
+        _sync_task = asyncio.create_task(_run_pending_syncs())
+        _sync_task.add_done_callback(_on_sync_done)
+
+async def _run_pending_syncs():
+    """Sync until no further request came in while the last one was sending"""
+    global _sync_pending
+    while _sync_pending:
+        _sync_pending = False
+        await sync_state_to_external()
+
+def _on_sync_done(task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        logging.warning(f"Sync failed (non-blocking): {task.exception()}")
+
+async def mark_current_item(item_id: str):
+    """Make item_id the only current schedule item in one round-trip"""
+    # At most one row is current (unique partial index), so clearing touches a single row
+    ops = [
+        UpdateOne({"is_current": True, "id": {"$ne": item_id}}, {"$set": {"is_current": False}}),
+        UpdateOne({"id": item_id}, {"$set": {"is_current": True}})
+    ]
+    async with _current_item_lock:
+        # A switch from another process can still land between the two ops; retry on its duplicate key
+        for attempt in range(3):
+            try:
+                await db.schedule.bulk_write(ops, ordered=True)
+                break
+            except BulkWriteError as e:
+                duplicate = all(err.get("code") == 11000 for err in e.details.get("writeErrors", []))
+                if not duplicate or attempt == 2:
+                    raise
+        await db.settings.update_one({"id": "main"}, {"$set": {"current_item_id": item_id}})
+
+async def find_adjacent_item(current: Dict[str, Any], forward: bool) -> Optional[Dict[str, Any]]:
+    """Schedule item right after (or before) current in (order, id) order"""
+    order, item_id = current.get("order", 0), current["id"]
+    op, direction = ("$gt", 1) if forward else ("$lt", -1)
+    return await db.schedule.find_one(
+        {"$or": [{"order": {op: order}}, {"order": order, "id": {op: item_id}}]},
+        {"_id": 0},
+        sort=[("order", direction), ("id", direction)]
+    )
+
+# Shared sorted cursors, served by the (order, id) indexes from init_default_data
+def find_phases():
+    return db.phases.find({}, {"_id": 0}).sort([("order", 1), ("id", 1)])
+
+# end_minutes is internal (auto-advance reads it from the current item) and is left out of API/sync output
+def find_schedule(projection: Optional[Dict[str, int]] = None):
+    return db.schedule.find({}, projection or {"_id": 0, "end_minutes": 0}).sort([("order", 1), ("id", 1)])
 
 async def get_full_state() -> Dict[str, Any]:
     """Get complete state for sync"""
-    settings = await db.settings.find_one({"id": "main"}, {"_id": 0})
-    phases = await db.phases.find({}, {"_id": 0}).sort("order", 1).to_list(100)
-    schedule = await db.schedule.find({}, {"_id": 0}).sort("order", 1).to_list(1000)
+    settings, phases, schedule = await asyncio.gather(
+        db.settings.find_one({"id": "main"}, {"_id": 0}),
+        find_phases().to_list(100),
+        find_schedule().to_list(1000)
+    )
     
     return {
         "settings": settings or {},
@@ -124,6 +299,87 @@ async def get_full_state() -> Dict[str, Any]:
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
 
+async def get_full_state_cached() -> Dict[str, Any]:
+    """Get complete state, served from Redis as long as the state version is unchanged"""
+    if not redis_client:
+        return await get_full_state()
+    
+    try:
+        version = await get_state_version()
+        body = await redis_client.get(f"state:{version}")
+        if body:
+            return orjson.loads(body)
+        
+        state = await get_full_state()
+        await redis_client.set(f"state:{version}", orjson.dumps(state), ex=STATE_CACHE_TTL)
+        return state
+    except RedisError as e:
+        logging.warning(f"Redis state cache unavailable: {e}")
+        return await get_full_state()
+
+async def get_settings_cached() -> Optional[Dict[str, Any]]:
+    """Get the settings document, re-reading MongoDB at most every LOCAL_CACHE_TTL seconds"""
+    global _settings_cache
+    if _settings_cache and time.monotonic() - _settings_cache[0] < LOCAL_CACHE_TTL:
+        return _settings_cache[1]
+    
+    settings = await db.settings.find_one({"id": "main"}, {"_id": 0})
+    _settings_cache = (time.monotonic(), settings)
+    return settings
+
+async def get_phases_cached() -> List[Dict[str, Any]]:
+    """Get all phases, re-reading MongoDB at most every LOCAL_CACHE_TTL seconds"""
+    global _phases_cache
+    if _phases_cache and time.monotonic() - _phases_cache[0] < LOCAL_CACHE_TTL:
+        return _phases_cache[1]
+    
+    phases = await find_phases().to_list(100)
+    _phases_cache = (time.monotonic(), phases)
+    return phases
+
+async def bump_state_version():
+    """Invalidate the cached state after a mutation"""
+    global _settings_cache, _phases_cache, _local_state_version, _redis_version_stale
+    _settings_cache = None
+    _phases_cache = None
+    _local_state_version += 1
+    _advance_wake.set()
+    
+    try:
+        if redis_client:
+            await redis_client.hincrby(STATE_VERSION_KEY, "ver", 1)
+            _redis_version_stale = False
+    except RedisError as e:
+        # An unchanged shared version would let clients revalidate against stale state
+        _redis_version_stale = True
+        logging.warning(f"Failed to bump state version: {e}")
+    
+    # Route cache keys carry the version; Redis entries of old versions expire, in-memory ones are dropped
+    if not redis_client:
+        await FastAPICache.clear(namespace=ROUTE_CACHE_NAMESPACE)
+
+async def get_state_version() -> str:
+    """Current state version, shared through Redis when available"""
+    if redis_client and not _redis_version_stale:
+        try:
+            gen, ver = await redis_client.hmget(STATE_VERSION_KEY, "gen", "ver")
+            if gen is None:
+                # New or lost (flushed/evicted) hash: a fresh generation keeps old versions from recurring
+                await redis_client.hsetnx(STATE_VERSION_KEY, "gen", uuid.uuid4().hex[:8])
+                gen, ver = await redis_client.hmget(STATE_VERSION_KEY, "gen", "ver")
+            return f"{gen.decode()}-{int(ver or 0)}"
+        except RedisError as e:
+            logging.warning(f"Redis state version unavailable: {e}")
+    return f"{_boot_id}-{_local_state_version}"
+
+async def state_cache_key(func, namespace: str = "", **kwargs) -> str:
+    """Route cache key for the current state version, so responses computed before a bump are never served after it"""
+    return f"{namespace}:{func.__module__}:{func.__name__}:{await get_state_version()}"
+
+async def get_state_etag() -> str:
+    """Weak ETag for the current state version"""
+    return f'W/"{await get_state_version()}"'
+
 # =============== STARTUP ===============
 
 async def notify_n8n_startup():
@@ -133,21 +389,33 @@ async def notify_n8n_startup():
             hostname = socket.gethostname()
             local_ip = socket.gethostbyname(hostname)
             
-            async with httpx.AsyncClient() as client_http:
-                await client_http.post(N8N_WEBHOOK_URL, json={
-                    "event": "startup",
-                    "hostname": hostname,
-                    "ip": local_ip,
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                    "message": f"Event Dashboard gestartet auf {local_ip}"
-                }, timeout=10)
+            await app.state.http.post(N8N_WEBHOOK_URL, json={
+                "event": "startup",
+                "hostname": hostname,
+                "ip": local_ip,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "message": f"Event Dashboard gestartet auf {local_ip}"
+            })
             logging.info(f"N8N notified: IP={local_ip}")
         except Exception as e:
             logging.error(f"Failed to notify N8N: {e}")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global auto_advance_task
+    global auto_advance_task, redis_client
+    if REDIS_URL:
+        redis_client = aioredis.from_url(REDIS_URL)
+        FastAPICache.init(RedisBackend(redis_client), prefix="evt", key_builder=state_cache_key)
+        logging.info("Redis state cache enabled")
+    else:
+        FastAPICache.init(InMemoryBackend(), prefix="evt", key_builder=state_cache_key)
+    
+    # Shared HTTP client so syncs reuse keep-alive connections
+    app.state.http = httpx.AsyncClient(
+        timeout=10,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+    )
+    
     await notify_n8n_startup()
     await init_default_data()
     
@@ -165,9 +433,15 @@ async def lifespan(app: FastAPI):
         except asyncio.CancelledError:
             pass
     
+    # Let in-flight syncs finish before closing the HTTP client
+    if _sync_task:
+        await asyncio.gather(_sync_task, return_exceptions=True)
+    await app.state.http.aclose()
+    if redis_client:
+        await redis_client.aclose()
     client.close()
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 api_router = APIRouter(prefix="/api")
 
 # =============== MODELS ===============
@@ -267,6 +541,13 @@ class EventSettingsUpdate(BaseModel):
 class ReorderRequest(BaseModel):
     item_ids: List[str]
 
+class ControlOp(BaseModel):
+    op: Literal["pause", "next", "previous", "set-current", "clear-current"]
+    id: Optional[str] = None
+
+class ControlBatchRequest(BaseModel):
+    ops: List[ControlOp]
+
 class FullState(BaseModel):
     settings: Dict[str, Any]
     phases: List[Dict[str, Any]]
@@ -275,11 +556,13 @@ class FullState(BaseModel):
 
 # =============== AUTH HELPERS ===============
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+# bcrypt and JWT work run in a worker thread so they don't stall the event loop
+async def hash_password(password: str) -> str:
+    hashed = await asyncio.to_thread(bcrypt.hashpw, password.encode(), bcrypt.gensalt())
+    return hashed.decode()
 
-def verify_password(password: str, password_hash: str) -> bool:
-    return bcrypt.checkpw(password.encode(), password_hash.encode())
+async def verify_password(password: str, password_hash: str) -> bool:
+    return await asyncio.to_thread(bcrypt.checkpw, password.encode(), password_hash.encode())
 
 def create_token(username: str) -> str:
     payload = {
@@ -291,8 +574,16 @@ def create_token(username: str) -> str:
 async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
     if not credentials:
         raise HTTPException(status_code=401, detail="Nicht autorisiert")
+    
+    key = hashlib.blake2b(credentials.credentials.encode(), digest_size=16).digest()
+    cached = _jwt_cache.get(key)
+    if cached and cached[1] > datetime.now(timezone.utc).timestamp():
+        return cached[0]
+    
     try:
-        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        # Only reached on a cache miss
+        payload = await asyncio.to_thread(jwt.decode, credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        _jwt_cache[key] = (payload["username"], payload["exp"])
         return payload["username"]
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token abgelaufen")
@@ -302,19 +593,49 @@ async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(
 # =============== INIT DEFAULT DATA ===============
 
 async def init_default_data():
+    # Indexes for ordered scans, next/previous and current-item lookups
+    await db.schedule.create_index([("order", 1), ("id", 1)])
+    
+    # Items imported without an order can't be stepped through; number them by current position
+    if await db.schedule.count_documents({"order": {"$exists": False}}, limit=1):
+        item_ids = [doc["id"] async for doc in find_schedule({"_id": 0, "id": 1})]
+        await db.schedule.bulk_write(
+            [UpdateOne({"id": item_id}, {"$set": {"order": idx}}) for idx, item_id in enumerate(item_ids)],
+            ordered=False
+        )
+    
+    # At most one current item: repair older data, replace the non-unique index, then enforce
+    if await db.schedule.count_documents({"is_current": True}, limit=2) > 1:
+        settings = await db.settings.find_one({"id": "main"}, {"_id": 0, "current_item_id": 1}) or {}
+        await db.schedule.update_many(
+            {"is_current": True, "id": {"$ne": settings.get("current_item_id")}},
+            {"$set": {"is_current": False}}
+        )
+    indexes = await db.schedule.index_information()
+    if "is_current_1" in indexes and not indexes["is_current_1"].get("unique"):
+        await db.schedule.drop_index("is_current_1")
+    await db.schedule.create_index("is_current", unique=True, partialFilterExpression={"is_current": True})
+    await db.phases.create_index([("order", 1), ("id", 1)])
+    await db.admins.create_index("username", unique=True)
+    
+    # Check existing defaults in parallel; bcrypt only runs if the admin is missing
+    admin_count, settings, phases_count = await asyncio.gather(
+        db.admins.count_documents({"username": "admin"}, limit=1),
+        db.settings.find_one({"id": "main"}, {"_id": 0, "auto_advance": 1}),
+        db.phases.estimated_document_count()
+    )
+    
     # Create default admin if not exists
-    admin = await db.admins.find_one({"username": "admin"})
-    if not admin:
+    if not admin_count:
         admin_user = AdminUser(
             username="admin",
-            password_hash=hash_password("admin123")
+            password_hash=await hash_password("admin123")
         )
         await db.admins.insert_one(admin_user.model_dump())
         logging.info("Default admin created: admin/admin123")
     
     # Create default settings if not exists
-    settings = await db.settings.find_one({"id": "main"})
-    if not settings:
+    if settings is None:
         default_settings = EventSettings()
         await db.settings.insert_one(default_settings.model_dump())
         logging.info("Default settings created")
@@ -324,7 +645,6 @@ async def init_default_data():
             await db.settings.update_one({"id": "main"}, {"$set": {"auto_advance": True}})
     
     # Create default phases if not exists
-    phases_count = await db.phases.count_documents({})
     if phases_count == 0:
         default_phases = [
             Phase(name="Vorbereitung", color="#3b82f6", order=0),
@@ -332,8 +652,7 @@ async def init_default_data():
             Phase(name="Pause", color="#f59e0b", order=2),
             Phase(name="Ende", color="#71717a", order=3)
         ]
-        for phase in default_phases:
-            await db.phases.insert_one(phase.model_dump())
+        await db.phases.insert_many([phase.model_dump() for phase in default_phases])
         logging.info("Default phases created")
 
 # =============== AUTH ROUTES ===============
@@ -341,10 +660,10 @@ async def init_default_data():
 @api_router.post("/auth/login", response_model=TokenResponse)
 async def login(data: AdminLogin):
     admin = await db.admins.find_one({"username": data.username}, {"_id": 0})
-    if not admin or not verify_password(data.password, admin["password_hash"]):
+    if not admin or not await verify_password(data.password, admin["password_hash"]):
         raise HTTPException(status_code=401, detail="Ungültige Anmeldedaten")
     
-    token = create_token(data.username)
+    token = await asyncio.to_thread(create_token, data.username)
     return TokenResponse(token=token, username=data.username)
 
 @api_router.get("/auth/verify")
@@ -353,7 +672,7 @@ async def verify_token(admin: str = Depends(get_current_admin)):
 
 @api_router.post("/auth/change-password")
 async def change_password(data: AdminUserCreate, admin: str = Depends(get_current_admin)):
-    new_hash = hash_password(data.password)
+    new_hash = await hash_password(data.password)
     await db.admins.update_one(
         {"username": admin},
         {"$set": {"password_hash": new_hash}}
@@ -364,14 +683,14 @@ async def change_password(data: AdminUserCreate, admin: str = Depends(get_curren
 
 @api_router.get("/settings", response_model=EventSettings)
 async def get_settings():
-    settings = await db.settings.find_one({"id": "main"}, {"_id": 0})
+    settings = await get_settings_cached()
     if not settings:
         return EventSettings()
     return EventSettings(**settings)
 
 @api_router.put("/settings", response_model=EventSettings)
 async def update_settings(data: EventSettingsUpdate, admin: str = Depends(get_current_admin)):
-    update_data = {k: v for k, v in data.model_dump().items() if v is not None}
+    update_data = data.model_dump(exclude_unset=True, exclude_none=True)
     if update_data:
         await db.settings.update_one(
             {"id": "main"},
@@ -381,22 +700,25 @@ async def update_settings(data: EventSettingsUpdate, admin: str = Depends(get_cu
     settings = await db.settings.find_one({"id": "main"}, {"_id": 0})
     
     # Sync to external API
-    await sync_state_to_external()
+    await bump_state_version()
+    schedule_external_sync()
     
     return EventSettings(**settings)
 
 # =============== PHASES ROUTES ===============
 
 @api_router.get("/phases", response_model=List[Phase])
+@cache(expire=ROUTE_CACHE_TTL, namespace=ROUTE_CACHE_NAMESPACE)
 async def get_phases():
-    phases = await db.phases.find({}, {"_id": 0}).sort("order", 1).to_list(100)
+    phases = await get_phases_cached()
     return [Phase(**p) for p in phases]
 
 @api_router.post("/phases", response_model=Phase)
 async def create_phase(data: PhaseCreate, admin: str = Depends(get_current_admin)):
     phase = Phase(**data.model_dump())
     await db.phases.insert_one(phase.model_dump())
-    await sync_state_to_external()
+    await bump_state_version()
+    schedule_external_sync()
     return phase
 
 @api_router.put("/phases/{phase_id}", response_model=Phase)
@@ -406,7 +728,8 @@ async def update_phase(phase_id: str, data: PhaseCreate, admin: str = Depends(ge
     phase = await db.phases.find_one({"id": phase_id}, {"_id": 0})
     if not phase:
         raise HTTPException(status_code=404, detail="Phase nicht gefunden")
-    await sync_state_to_external()
+    await bump_state_version()
+    schedule_external_sync()
     return Phase(**phase)
 
 @api_router.delete("/phases/{phase_id}")
@@ -414,15 +737,17 @@ async def delete_phase(phase_id: str, admin: str = Depends(get_current_admin)):
     result = await db.phases.delete_one({"id": phase_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Phase nicht gefunden")
-    await sync_state_to_external()
+    await bump_state_version()
+    schedule_external_sync()
     return {"message": "Phase gelöscht"}
 
 # =============== SCHEDULE ROUTES ===============
 
+# Imported items are stored as received, so the response model normalises them (defaults, no extra fields)
 @api_router.get("/schedule", response_model=List[ScheduleItem])
+@cache(expire=ROUTE_CACHE_TTL, namespace=ROUTE_CACHE_NAMESPACE)
 async def get_schedule():
-    items = await db.schedule.find({}, {"_id": 0}).sort("order", 1).to_list(1000)
-    return [ScheduleItem(**item) for item in items]
+    return await find_schedule().to_list(1000)
 
 @api_router.post("/schedule", response_model=ScheduleItem)
 async def create_schedule_item(data: ScheduleItemCreate, admin: str = Depends(get_current_admin)):
@@ -433,19 +758,32 @@ async def create_schedule_item(data: ScheduleItemCreate, admin: str = Depends(ge
     item_data = data.model_dump()
     item_data["order"] = new_order
     item = ScheduleItem(**item_data)
-    await db.schedule.insert_one(item.model_dump())
-    await sync_state_to_external()
+    await db.schedule.insert_one({**item.model_dump(), "end_minutes": parse_end_minutes(item.end_time)})
+    await bump_state_version()
+    schedule_external_sync()
     return item
 
 @api_router.put("/schedule/{item_id}", response_model=ScheduleItem)
 async def update_schedule_item(item_id: str, data: ScheduleItemUpdate, admin: str = Depends(get_current_admin)):
-    update_data = {k: v for k, v in data.model_dump().items() if v is not None}
+    update_data = data.model_dump(exclude_unset=True, exclude_none=True)
+    if "end_time" in update_data:
+        update_data["end_minutes"] = parse_end_minutes(update_data["end_time"])
+    # Becoming current must also clear the previous current item; False is a plain write
+    make_current = update_data.get("is_current") is True
+    if make_current:
+        del update_data["is_current"]
     if update_data:
         await db.schedule.update_one({"id": item_id}, {"$set": update_data})
     item = await db.schedule.find_one({"id": item_id}, {"_id": 0})
     if not item:
         raise HTTPException(status_code=404, detail="Zeitplan-Eintrag nicht gefunden")
-    await sync_state_to_external()
+    if make_current:
+        await mark_current_item(item_id)
+        item["is_current"] = True
+    elif update_data.get("is_current") is False:
+        await db.settings.update_one({"id": "main", "current_item_id": item_id}, {"$set": {"current_item_id": None}})
+    await bump_state_version()
+    schedule_external_sync()
     return ScheduleItem(**item)
 
 @api_router.delete("/schedule/{item_id}")
@@ -453,100 +791,150 @@ async def delete_schedule_item(item_id: str, admin: str = Depends(get_current_ad
     result = await db.schedule.delete_one({"id": item_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Zeitplan-Eintrag nicht gefunden")
-    await sync_state_to_external()
+    await bump_state_version()
+    schedule_external_sync()
     return {"message": "Eintrag gelöscht"}
 
 @api_router.post("/schedule/reorder")
 async def reorder_schedule(data: ReorderRequest, admin: str = Depends(get_current_admin)):
-    for idx, item_id in enumerate(data.item_ids):
-        await db.schedule.update_one({"id": item_id}, {"$set": {"order": idx}})
-    await sync_state_to_external()
+    ops = [UpdateOne({"id": item_id}, {"$set": {"order": idx}}) for idx, item_id in enumerate(data.item_ids)]
+    if ops:
+        await db.schedule.bulk_write(ops, ordered=False)
+    await bump_state_version()
+    schedule_external_sync()
     return {"message": "Reihenfolge aktualisiert"}
 
 # =============== CONTROL ROUTES ===============
 
-@api_router.post("/control/set-current/{item_id}")
-async def set_current_item(item_id: str, admin: str = Depends(get_current_admin)):
-    # Reset all items
-    await db.schedule.update_many({}, {"$set": {"is_current": False}})
-    # Set new current
-    await db.schedule.update_one({"id": item_id}, {"$set": {"is_current": True}})
-    await db.settings.update_one({"id": "main"}, {"$set": {"current_item_id": item_id}})
-    await sync_state_to_external()
-    return {"message": "Aktueller Eintrag gesetzt"}
+# Control operations return (response, changed); callers bump the state version and sync
+# once when anything changed, so a batch of several ops invalidates and syncs only once
 
-@api_router.post("/control/clear-current")
-async def clear_current_item(admin: str = Depends(get_current_admin)):
-    await db.schedule.update_many({}, {"$set": {"is_current": False}})
+async def apply_set_current(item_id: str) -> Tuple[Dict[str, Any], bool]:
+    await mark_current_item(item_id)
+    return {"message": "Aktueller Eintrag gesetzt"}, True
+
+async def apply_clear_current() -> Tuple[Dict[str, Any], bool]:
+    await db.schedule.update_one({"is_current": True}, {"$set": {"is_current": False}})
     await db.settings.update_one({"id": "main"}, {"$set": {"current_item_id": None}})
-    await sync_state_to_external()
-    return {"message": "Aktueller Eintrag zurückgesetzt"}
+    return {"message": "Aktueller Eintrag zurückgesetzt"}, True
 
-@api_router.post("/control/pause")
-async def toggle_pause(admin: str = Depends(get_current_admin)):
+async def apply_toggle_pause() -> Tuple[Dict[str, Any], bool]:
     settings = await db.settings.find_one({"id": "main"}, {"_id": 0})
     new_pause_state = not settings.get("is_paused", False)
     await db.settings.update_one({"id": "main"}, {"$set": {"is_paused": new_pause_state}})
-    await sync_state_to_external()
-    return {"is_paused": new_pause_state}
+    return {"is_paused": new_pause_state}, True
 
-@api_router.post("/control/next")
-async def next_item(admin: str = Depends(get_current_admin)):
+async def apply_next() -> Tuple[Dict[str, Any], bool]:
     settings = await db.settings.find_one({"id": "main"}, {"_id": 0})
     current_id = settings.get("current_item_id")
     
-    items = await db.schedule.find({}, {"_id": 0}).sort("order", 1).to_list(1000)
-    if not items:
-        return {"message": "Keine Einträge vorhanden"}
-    
-    if not current_id:
+    current = await db.schedule.find_one({"id": current_id}, {"_id": 0, "id": 1, "order": 1}) if current_id else None
+    if current:
+        # Find next item
+        new_item = await find_adjacent_item(current, forward=True)
+        if not new_item:
+            return {"message": "Bereits beim letzten Eintrag"}, False
+    else:
         # Start with first item
-        first_item = items[0]
-        await db.schedule.update_many({}, {"$set": {"is_current": False}})
-        await db.schedule.update_one({"id": first_item["id"]}, {"$set": {"is_current": True}})
-        await db.settings.update_one({"id": "main"}, {"$set": {"current_item_id": first_item["id"]}})
-        await sync_state_to_external()
-        return {"current_item_id": first_item["id"]}
-    
-    # Find next item
-    current_idx = next((i for i, item in enumerate(items) if item["id"] == current_id), -1)
-    if current_idx < len(items) - 1:
-        next_item = items[current_idx + 1]
-        await db.schedule.update_many({}, {"$set": {"is_current": False}})
-        await db.schedule.update_one({"id": next_item["id"]}, {"$set": {"is_current": True}})
-        await db.settings.update_one({"id": "main"}, {"$set": {"current_item_id": next_item["id"]}})
-        await sync_state_to_external()
-        return {"current_item_id": next_item["id"]}
+        new_item = await db.schedule.find_one({}, {"_id": 0, "id": 1}, sort=[("order", 1), ("id", 1)])
+        if not new_item:
+            return {"message": "Keine Einträge vorhanden"}, False
     
-    return {"message": "Bereits beim letzten Eintrag"}
+    await mark_current_item(new_item["id"])
+    return {"current_item_id": new_item["id"]}, True
 
-@api_router.post("/control/previous")
-async def previous_item(admin: str = Depends(get_current_admin)):
+async def apply_previous() -> Tuple[Dict[str, Any], bool]:
     settings = await db.settings.find_one({"id": "main"}, {"_id": 0})
     current_id = settings.get("current_item_id")
     
     if not current_id:
-        return {"message": "Kein aktueller Eintrag"}
+        return {"message": "Kein aktueller Eintrag"}, False
     
-    items = await db.schedule.find({}, {"_id": 0}).sort("order", 1).to_list(1000)
-    current_idx = next((i for i, item in enumerate(items) if item["id"] == current_id), -1)
+    current = await db.schedule.find_one({"id": current_id}, {"_id": 0, "id": 1, "order": 1})
+    prev_item = None
+    if current:
+        prev_item = await find_adjacent_item(current, forward=False)
     
-    if current_idx > 0:
-        prev_item = items[current_idx - 1]
-        await db.schedule.update_many({}, {"$set": {"is_current": False}})
-        await db.schedule.update_one({"id": prev_item["id"]}, {"$set": {"is_current": True}})
-        await db.settings.update_one({"id": "main"}, {"$set": {"current_item_id": prev_item["id"]}})
-        await sync_state_to_external()
-        return {"current_item_id": prev_item["id"]}
+    if prev_item:
+        await mark_current_item(prev_item["id"])
+        return {"current_item_id": prev_item["id"]}, True
     
-    return {"message": "Bereits beim ersten Eintrag"}
+    return {"message": "Bereits beim ersten Eintrag"}, False
+
+async def run_control_op(apply: Awaitable[Tuple[Dict[str, Any], bool]]) -> Dict[str, Any]:
+    result, changed = await apply
+    if changed:
+        await bump_state_version()
+        schedule_external_sync()
+    return result
+
+@api_router.post("/control/set-current/{item_id}")
+async def set_current_item(item_id: str, admin: str = Depends(get_current_admin)):
+    return await run_control_op(apply_set_current(item_id))
+
+@api_router.post("/control/clear-current")
+async def clear_current_item(admin: str = Depends(get_current_admin)):
+    return await run_control_op(apply_clear_current())
+
+@api_router.post("/control/pause")
+async def toggle_pause(admin: str = Depends(get_current_admin)):
+    return await run_control_op(apply_toggle_pause())
+
+@api_router.post("/control/next")
+async def next_item(admin: str = Depends(get_current_admin)):
+    return await run_control_op(apply_next())
+
+@api_router.post("/control/previous")
+async def previous_item(admin: str = Depends(get_current_admin)):
+    return await run_control_op(apply_previous())
+
+@api_router.post("/control/batch")
+async def control_batch(data: ControlBatchRequest, admin: str = Depends(get_current_admin)):
+    """Run several control operations in order with one request"""
+    handlers = {
+        "pause": apply_toggle_pause,
+        "next": apply_next,
+        "previous": apply_previous,
+        "clear-current": apply_clear_current
+    }
+    
+    results = []
+    changed = False
+    try:
+        for op in data.ops:
+            try:
+                if op.op == "set-current":
+                    if not op.id:
+                        raise HTTPException(status_code=400, detail="Keine ID angegeben")
+                    result, op_changed = await apply_set_current(op.id)
+                else:
+                    result, op_changed = await handlers[op.op]()
+                changed = changed or op_changed
+                results.append({"op": op.op, "status": 200, "result": result})
+            except HTTPException as e:
+                results.append({"op": op.op, "status": e.status_code, "detail": e.detail})
+            except Exception as e:
+                logging.error(f"Control batch op '{op.op}' failed: {e}")
+                results.append({"op": op.op, "status": 500, "detail": str(e)})
+    finally:
+        # Ops applied before a failure still need to become visible
+        if changed:
+            await bump_state_version()
+            schedule_external_sync()
+    
+    return {"results": results}
 
 # =============== STATE SYNC ROUTES ===============
 
 @api_router.get("/state")
-async def get_state():
-    """Get full state (for dashboard/viewer)"""
-    return await get_full_state()
+async def get_state(request: Request, response: Response):
+    """Get full state (for dashboard/viewer), 304 if the client's ETag is current"""
+    etag = await get_state_etag()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    response.headers["ETag"] = etag
+    return await get_full_state_cached()
 
 @api_router.post("/state")
 async def set_state(state: FullState, admin: str = Depends(get_current_admin)):
@@ -561,17 +949,14 @@ async def set_state(state: FullState, admin: str = Depends(get_current_admin)):
         # Update phases
         if state.phases:
             await db.phases.delete_many({})
-            for phase in state.phases:
-                phase_data = {k: v for k, v in phase.items() if k != "_id"}
-                await db.phases.insert_one(phase_data)
+            await db.phases.insert_many([{k: v for k, v in phase.items() if k != "_id"} for phase in state.phases])
         
         # Update schedule
         if state.schedule:
             await db.schedule.delete_many({})
-            for item in state.schedule:
-                item_data = {k: v for k, v in item.items() if k != "_id"}
-                await db.schedule.insert_one(item_data)
+            await db.schedule.insert_many(prepare_schedule_import(state.schedule))
         
+        await bump_state_version()
         return {"message": "State aktualisiert", "timestamp": datetime.now(timezone.utc).isoformat()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -583,32 +968,28 @@ async def sync_from_external(admin: str = Depends(get_current_admin)):
         raise HTTPException(status_code=400, detail="Keine externe API konfiguriert")
     
     try:
-        async with httpx.AsyncClient() as http_client:
-            response = await http_client.get(EXTERNAL_STATE_API, timeout=10)
-            if response.status_code == 200:
-                state = response.json()
-                
-                # Update local database with external state
-                if "settings" in state and state["settings"]:
-                    settings_data = {k: v for k, v in state["settings"].items() if k != "_id"}
-                    settings_data["id"] = "main"
-                    await db.settings.replace_one({"id": "main"}, settings_data, upsert=True)
-                
-                if "phases" in state and state["phases"]:
-                    await db.phases.delete_many({})
-                    for phase in state["phases"]:
-                        phase_data = {k: v for k, v in phase.items() if k != "_id"}
-                        await db.phases.insert_one(phase_data)
-                
-                if "schedule" in state and state["schedule"]:
-                    await db.schedule.delete_many({})
-                    for item in state["schedule"]:
-                        item_data = {k: v for k, v in item.items() if k != "_id"}
-                        await db.schedule.insert_one(item_data)
-                
-                return {"message": "State von externer API synchronisiert", "timestamp": datetime.now(timezone.utc).isoformat()}
-            else:
-                raise HTTPException(status_code=response.status_code, detail="Externe API Fehler")
+        response = await app.state.http.get(EXTERNAL_STATE_API)
+        if response.status_code == 200:
+            state = response.json()
+            
+            # Update local database with external state
+            if "settings" in state and state["settings"]:
+                settings_data = {k: v for k, v in state["settings"].items() if k != "_id"}
+                settings_data["id"] = "main"
+                await db.settings.replace_one({"id": "main"}, settings_data, upsert=True)
+            
+            if "phases" in state and state["phases"]:
+                await db.phases.delete_many({})
+                await db.phases.insert_many([{k: v for k, v in phase.items() if k != "_id"} for phase in state["phases"]])
+            
+            if "schedule" in state and state["schedule"]:
+                await db.schedule.delete_many({})
+                await db.schedule.insert_many(prepare_schedule_import(state["schedule"]))
+            
+            await bump_state_version()
+            return {"message": "State von externer API synchronisiert", "timestamp": datetime.now(timezone.utc).isoformat()}
+        else:
+            raise HTTPException(status_code=response.status_code, detail="Externe API Fehler")
     except httpx.RequestError as e:
         raise HTTPException(status_code=503, detail=f"Externe API nicht erreichbar: {str(e)}")
 
@@ -619,7 +1000,7 @@ async def sync_to_external(admin: str = Depends(get_current_admin)):
         raise HTTPException(status_code=400, detail="Keine externe API konfiguriert")
     
     try:
-        await sync_state_to_external()
+        await sync_state_to_external(force=True)
         return {"message": "State an externe API gesendet", "timestamp": datetime.now(timezone.utc).isoformat()}
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Sync fehlgeschlagen: {str(e)}")
@@ -633,6 +1014,47 @@ async def root():
 # Include router and middleware
 app.include_router(api_router)
 
+class RevalidateCachedRoutes:
+    """Swap fastapi-cache2's max-age and per-process hash() ETag for no-cache and a body digest"""
+    
+    def __init__(self, app, paths: set):
+        self.app = app
+        self.paths = paths
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        
+        start, chunks = None, []
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            else:
+                chunks.append(message.get("body", b""))
+        await self.app(scope, receive, capture)
+        
+        body = b"".join(chunks)
+        headers = MutableHeaders(raw=list(start["headers"]))
+        if start["status"] == 200 and FastAPICache.get_cache_status_header() in headers:
+            etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            headers["ETag"] = etag
+            headers["Cache-Control"] = "no-cache"
+            if Headers(scope=scope).get("if-none-match") == etag:
+                await send({"type": "http.response.start", "status": 304, "headers": [
+                    (b"etag", etag.encode()), (b"cache-control", b"no-cache")
+                ]})
+                await send({"type": "http.response.body", "body": b""})
+                return
+        await send({**start, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
+
+app.add_middleware(RevalidateCachedRoutes, paths={"/api/phases", "/api/schedule"})
+
+# Compress larger JSON responses (schedule/phases/state lists)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,